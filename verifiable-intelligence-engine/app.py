@@ -1,33 +1,105 @@
 # app.py
-from fastapi import FastAPI, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException, Response, status
+from pydantic import Base64Bytes, BaseModel, Field
 import numpy as np
+import orjson
+import numba
+from numba import njit, prange
+from sklearn import config_context
 from sklearn.ensemble import IsolationForest
 import logging
 import asyncio
-from typing import List, Optional
+import hashlib
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Set, Tuple
+import threading
 import time
 import joblib
 import os
+import pickle
 import shutil
 import uvicorn
+import weakref
+from cachetools import LRUCache
+from watchfiles import awatch
+
+from sklearn.ensemble._iforest import _average_path_length
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
+logging.getLogger("watchfiles").setLevel(logging.WARNING)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _BATCH_QUEUE
+    _ON_DISK.update(_scan_model_dir())
+    stop_watching = asyncio.Event()
+    watcher = asyncio.create_task(_watch_model_dir(stop_watching))
+    await _warm_model_cache()
+    batcher = None
+    if BATCH_WINDOW_MS > 0:
+        _BATCH_QUEUE = asyncio.Queue()
+        batcher = asyncio.create_task(_run_batcher(_BATCH_QUEUE))
+    yield
+    if batcher is not None:
+        batcher.cancel()
+        _BATCH_QUEUE = None
+    stop_watching.set()
+    await watcher
 
 # Initialize FastAPI application
 app = FastAPI(
     title="Verifiable Intelligence Engine Anomaly Detection Core",
     description="Deterministic platform for identifying data anomalies and calculating Empirical Verifiability Scores, compliant with GDPR and eIDAS 2.0 principles.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 MODEL_DIR = "models"
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Process-local cache of deserialized models keyed by model_id. Each entry also records the
+# mtime of the file it came from, so _watch_model_dir can tell out-of-band updates apart. It is
+# bounded so that requests for many distinct model_ids cannot grow the worker without limit;
+# the least recently used model is evicted and simply reloaded from disk if asked for again.
+MODEL_CACHE_SIZE = int(os.getenv("MODEL_CACHE_SIZE", 32))
+_MODEL_CACHE: "LRUCache[str, Tuple[IsolationForest, int]]" = LRUCache(maxsize=MODEL_CACHE_SIZE)
+# LRUCache reorders itself even on reads, and training threads evict from it.
+_MODEL_CACHE_LOCK = threading.Lock()
+# Held only while a load or train is in progress, so unused model_ids do not accumulate.
+_MODEL_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# model_ids with a file in MODEL_DIR, kept current by _watch_model_dir so requests never stat.
+_ON_DISK: Set[str] = set()
+
+# sklearn only spreads scoring across trees inside a joblib context, and for small batches
+# the thread fan-out costs more than it saves, so parallel scoring is gated on batch size.
+IFOREST_JOBS = int(os.getenv("IFOREST_JOBS", os.cpu_count() or 1))
+PARALLEL_PREDICT_MIN_ROWS = int(os.getenv("PARALLEL_PREDICT_MIN_ROWS", 1000))
+
+# Forest size, which bounds both model size on disk and scoring cost. The defaults are sklearn's
+# own, so existing deployments keep producing identical models.
+IFOREST_ESTIMATORS = int(os.getenv("IFOREST_ESTIMATORS", 100))
+IFOREST_MAX_SAMPLES = int(os.getenv("IFOREST_MAX_SAMPLES", 256))
+
+# Opt-in micro-batching. With BATCH_WINDOW_MS > 0, small detection requests are scored straight
+# away while nothing else is being scored, and those that arrive while scoring is in flight are
+# held for up to BATCH_WINDOW_MS (or until BATCH_MAX_ROWS rows are queued) and scored together in
+# one call per model. Off by default: scoring a small request is cheap enough that holding it
+# for a window costs more latency than sharing the call saves.
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", 0))
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", 1024))
+_BATCH_QUEUE: Optional["asyncio.Queue[Tuple[IsolationForest, np.ndarray, asyncio.Future]]"] = None
+# Scoring calls (direct or batched) currently running in worker threads.
+_SCORES_IN_FLIGHT = 0
+# Strong references to running flushes, which the event loop only holds weakly.
+_BATCH_FLUSHES: Set["asyncio.Task[None]"] = set()
+
 class DataInput(BaseModel):
-    data: List[List[float]] = Field(..., description="List of data samples, where each sample is a list of features.")
+    data: List[List[float]] = Field(default_factory=list, description="List of data samples, where each sample is a list of features.")
+    raw_data: Optional[Base64Bytes] = Field(None, description="Base64-encoded little-endian float32 buffer of the samples in row-major order. Takes precedence over `data`.")
+    n_rows: Optional[int] = Field(None, gt=0, description="Number of samples encoded in `raw_data`.")
+    n_features: Optional[int] = Field(None, gt=0, description="Number of features per sample encoded in `raw_data`.")
     model_id: str = Field("default_model", description="Identifier for the anomaly detection model to use.")
     contamination: float = Field(0.01, ge=0.0, le=0.5, description="Expected proportion of outliers in the data. Used for Isolation Forest training.")
 
@@ -43,7 +115,10 @@ class ModelStatus(BaseModel):
     data_shape: Optional[int] = None
 
 class TrainingData(BaseModel):
-    data: List[List[float]] = Field(..., description="Training data samples, where each sample is a list of features.")
+    data: List[List[float]] = Field(default_factory=list, description="Training data samples, where each sample is a list of features.")
+    raw_data: Optional[Base64Bytes] = Field(None, description="Base64-encoded little-endian float32 buffer of the training samples in row-major order. Takes precedence over `data`.")
+    n_rows: Optional[int] = Field(None, gt=0, description="Number of samples encoded in `raw_data`.")
+    n_features: Optional[int] = Field(None, gt=0, description="Number of features per sample encoded in `raw_data`.")
     model_id: str = Field("default_model", description="Identifier for the model to train.")
     contamination: float = Field(0.01, ge=0.0, le=0.5, description="Expected proportion of outliers in the data.")
 
@@ -55,31 +130,366 @@ class TrainingResult(BaseModel):
 def _get_model_path(model_id: str) -> str:
     return os.path.join(MODEL_DIR, f"{model_id}.joblib")
 
-def _train_model_sync(model_id: str, data: np.ndarray, contamination: float) -> IsolationForest:
+def _payload_to_array(payload) -> np.ndarray:
+    # Raw buffers are viewed in place; JSON lists are converted straight to C-ordered float32,
+    # the layout the trees index, so scoring never has to make its own copy.
+    if payload.raw_data is None:
+        return np.ascontiguousarray(payload.data, dtype=np.float32)
+    if payload.n_rows is None or payload.n_features is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="raw_data requires n_rows and n_features.")
+    if len(payload.raw_data) != payload.n_rows * payload.n_features * 4:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="raw_data size does not match n_rows x n_features float32 values.")
+    return np.frombuffer(payload.raw_data, dtype="<f4").reshape(payload.n_rows, payload.n_features).astype(np.float32, copy=False)
+
+@njit(cache=True)
+def _summarize_scores(scores: np.ndarray) -> Tuple[float, float, float, np.ndarray]:
+    # min, max, mean and the +1/-1 labels in a single pass over the scores. Kept serial and
+    # without fastmath so the summation order, and therefore the score, never depends on the host.
+    # Labels are only ever +1/-1; int8 keeps the array orjson serializes as small as possible.
+    labels = np.empty(scores.shape[0], dtype=np.int8)
+    min_score = scores[0]
+    max_score = scores[0]
+    total = 0.0
+    for i in range(scores.shape[0]):
+        score = scores[i]
+        min_score = min(min_score, score)
+        max_score = max(max_score, score)
+        total += score
+        # decision_function is already shifted by offset_, so this is exactly predict()'s threshold.
+        labels[i] = -1 if score < 0 else 1
+    return min_score, max_score, total / scores.shape[0], labels
+
+_summarize_scores(np.zeros(2))  # compile (or load from the on-disk cache) at import, not on the first request
+
+@njit(cache=True, nogil=True)
+def _accumulate_depths(X, start, stop, depths, feature, threshold, left, right, missing_left, leaf_depth, roots):
+    # Walks rows start:stop down every flattened tree, taking the same branches as Tree.apply, and
+    # adds the leaf path lengths tree by tree, in the same order as sklearn's sequential scoring.
+    # Trees are the outer loop so one tree's nodes stay in cache across the rows.
+    for root in roots:
+        for i in range(start, stop):
+            node = root
+            while left[node] != -1:
+                value = X[i, feature[node]]
+                if np.isnan(value):
+                    node = left[node] if missing_left[node] else right[node]
+                elif value <= threshold[node]:
+                    node = left[node]
+                else:
+                    node = right[node]
+            depths[i] += leaf_depth[node]
+
+@njit(cache=True, nogil=True)
+def _forest_depths(X, feature, threshold, left, right, missing_left, leaf_depth, roots):
+    depths = np.zeros(X.shape[0])
+    _accumulate_depths(X, 0, X.shape[0], depths, feature, threshold, left, right, missing_left, leaf_depth, roots)
+    return depths
+
+@njit(cache=True, nogil=True, parallel=True)
+def _forest_depths_parallel(X, feature, threshold, left, right, missing_left, leaf_depth, roots):
+    # Rows are split into blocks across threads; each row's sum is still taken in tree order.
+    depths = np.zeros(X.shape[0])
+    block = 256
+    for b in prange((X.shape[0] + block - 1) // block):
+        _accumulate_depths(X, b * block, min((b + 1) * block, X.shape[0]), depths, feature, threshold, left, right, missing_left, leaf_depth, roots)
+    return depths
+
+# Numba's default workqueue threading layer aborts if two threads launch parallel kernels at once.
+_PARALLEL_KERNEL_LOCK = threading.Lock()
+
+def _flatten_forest(model: IsolationForest) -> Tuple[np.ndarray, ...]:
+    # Packs every tree's nodes into shared arrays (child indices offset into them, features mapped
+    # back to input columns) with each leaf's precomputed path length, for _forest_depths.
+    subsample_features = model._max_features != model.n_features_in_
+    features, thresholds, lefts, rights, missing_lefts, leaf_depths, roots = [], [], [], [], [], [], []
+    offset = 0
+    for tree_idx, (estimator, estimator_features) in enumerate(zip(model.estimators_, model.estimators_features_)):
+        tree = estimator.tree_
+        is_leaf = tree.children_left == -1
+        feature = np.where(is_leaf, 0, tree.feature)
+        if subsample_features:
+            feature = np.asarray(estimator_features)[feature]
+        features.append(feature)
+        thresholds.append(tree.threshold)
+        lefts.append(np.where(is_leaf, -1, tree.children_left + offset))
+        rights.append(np.where(is_leaf, -1, tree.children_right + offset))
+        missing_lefts.append(tree.missing_go_to_left)
+        leaf_depths.append(model._decision_path_lengths[tree_idx] + model._average_path_length_per_tree[tree_idx] - 1.0)
+        roots.append(offset)
+        offset += tree.node_count
+    return (
+        np.concatenate(features).astype(np.int32),
+        np.concatenate(thresholds).astype(np.float64),
+        np.concatenate(lefts).astype(np.int32),
+        np.concatenate(rights).astype(np.int32),
+        np.concatenate(missing_lefts).astype(np.uint8),
+        np.concatenate(leaf_depths).astype(np.float64),
+        np.array(roots, dtype=np.int32),
+    )
+
+# Compile both kernels for the dtypes _flatten_forest produces on a one-leaf forest.
+_WARMUP_FOREST = (np.zeros(1, np.int32), np.zeros(1), np.full(1, -1, np.int32), np.full(1, -1, np.int32), np.zeros(1, np.uint8), np.zeros(1), np.zeros(1, np.int32))
+_forest_depths(np.zeros((2, 1), np.float32), *_WARMUP_FOREST)
+_forest_depths_parallel(np.zeros((2, 1), np.float32), *_WARMUP_FOREST)
+
+def _training_digest(data: np.ndarray, contamination: float) -> str:
+    # Covers everything a trained model depends on, so a retrain on identical input can be skipped.
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(np.ascontiguousarray(data, dtype=np.float32))
+    digest.update(repr((data.shape, contamination, IFOREST_ESTIMATORS, IFOREST_MAX_SAMPLES)).encode())
+    return digest.hexdigest()
+
+def _train_model_sync(model_id: str, data: np.ndarray, contamination: float, digest: Optional[str] = None) -> IsolationForest:
     logger.info(f"Training new Isolation Forest model '{model_id}' with data shape {data.shape} and contamination {contamination}.")
-    model = IsolationForest(contamination=contamination, random_state=42)
-    model.fit(data)
-    joblib.dump(model, _get_model_path(model_id))
+    model = IsolationForest(
+        n_estimators=IFOREST_ESTIMATORS,
+        # Capped at the sample count like max_samples="auto" does, instead of warning about it.
+        max_samples=min(IFOREST_MAX_SAMPLES, data.shape[0]),
+        contamination=contamination,
+        random_state=42,
+        n_jobs=IFOREST_JOBS
+    )
+    # IsolationForest fits in float32; this is a no-op for the arrays built by the endpoints.
+    with config_context(assume_finite=True):
+        model.fit(np.asarray(data, dtype=np.float32))
+    # Saved with the model, so identical retrains are recognised across restarts and workers.
+    model.training_digest_ = digest or _training_digest(data, contamination)
+    model_path = _get_model_path(model_id)
+    # Uncompressed so loads skip decompression. Written beside the target and renamed over it, so
+    # a concurrent load never reads a half-written file.
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    joblib.dump(model, tmp_path, compress=0, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, model_path)
+    _evict_model(model_id)
     logger.info(f"Model '{model_id}' trained and saved.")
     return model
 
-async def get_or_train_model(model_id: str, data: np.ndarray, contamination: float) -> IsolationForest:
-    model_path = _get_model_path(model_id)
-    if os.path.exists(model_path):
-        logger.info(f"Loading model '{model_id}' from disk.")
-        return joblib.load(model_path)
+def _get_cached_entry(model_id: str) -> Optional[Tuple[IsolationForest, int]]:
+    with _MODEL_CACHE_LOCK:
+        return _MODEL_CACHE.get(model_id)
+
+def _is_cached(model_id: str) -> bool:
+    with _MODEL_CACHE_LOCK:
+        return model_id in _MODEL_CACHE
+
+def _cached_model_count() -> int:
+    with _MODEL_CACHE_LOCK:
+        return len(_MODEL_CACHE)
+
+def _cache_model(model_id: str, entry: Tuple[IsolationForest, int]):
+    with _MODEL_CACHE_LOCK:
+        _MODEL_CACHE[model_id] = entry
+
+def _evict_model(model_id: str, unless_mtime: Optional[int] = None):
+    with _MODEL_CACHE_LOCK:
+        entry = _MODEL_CACHE.get(model_id)
+        if entry is not None and entry[1] != unless_mtime:
+            del _MODEL_CACHE[model_id]
+
+def _model_id_from_path(path: str) -> Optional[str]:
+    name = os.path.basename(path)
+    return name[:-len(".joblib")] if name.endswith(".joblib") else None
+
+def _scan_model_dir() -> Set[str]:
+    return {model_id for model_id in map(_model_id_from_path, os.listdir(MODEL_DIR)) if model_id}
+
+async def _watch_model_dir(stop_event: asyncio.Event):
+    # Picks up models written or removed by other processes. Our own writes show up here too;
+    # those match the cached mtime and leave the cache entry alone. Changes are delivered within
+    # about 200ms rather than watchfiles' default 1.6s, which bounds how long another worker can
+    # keep serving a model that was retrained underneath it.
+    async for changes in awatch(MODEL_DIR, debounce=200, step=20, stop_event=stop_event):
+        for _, path in changes:
+            model_id = _model_id_from_path(path)
+            if model_id is None:
+                continue
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                _ON_DISK.discard(model_id)
+                _evict_model(model_id)
+                continue
+            _ON_DISK.add(model_id)
+            _evict_model(model_id, unless_mtime=mtime)
+
+def _prepare_model(model: IsolationForest) -> IsolationForest:
+    # The forest-wide path length normaliser only depends on max_samples, but sklearn recomputes
+    # it on every scoring call; cache it so _decision_function can skip that.
+    if hasattr(model, "_decision_path_lengths"):
+        try:
+            model._flat_forest = _flatten_forest(model)
+        except AttributeError as e:
+            # Trees from a scikit-learn without missing value support have no missing_go_to_left.
+            logger.warning(f"Scoring model with sklearn's decision_function; cannot flatten it: {e}")
+            return model
+        model._cached_avg_path_len = float(_average_path_length([model._max_samples])[0])
+    return model
+
+def _decision_function(model: IsolationForest, data: np.ndarray, n_jobs: int = 1) -> np.ndarray:
+    # Same result as model.decision_function, built from the flattened forest's per-leaf path
+    # lengths and the normaliser cached by _prepare_model. sklearn's check_array/validate_data
+    # pass is skipped: callers hand over 2D float32 data, and the feature count is checked here
+    # because the trees are walked unchecked.
+    flat_forest = getattr(model, "_flat_forest", None)
+    if flat_forest is None:
+        return model.decision_function(data)
+    X = np.ascontiguousarray(data, dtype=np.float32)
+    if X.shape[1] != model.n_features_in_:
+        raise ValueError(f"X has {X.shape[1]} features, but the model expects {model.n_features_in_} features.")
+    if n_jobs > 1:
+        with _PARALLEL_KERNEL_LOCK:
+            numba.set_num_threads(min(n_jobs, numba.config.NUMBA_NUM_THREADS))
+            depths = _forest_depths_parallel(X, *flat_forest)
     else:
-        return await asyncio.to_thread(_train_model_sync, model_id, data, contamination)
+        depths = _forest_depths(X, *flat_forest)
+    denominator = len(model.estimators_) * model._cached_avg_path_len
+    # For a single training sample both depth and denominator are 0 and the score is defined as 1.
+    scores = 2 ** -np.divide(depths, denominator, out=np.ones_like(depths), where=denominator != 0)
+    return -scores - model.offset_
+
+def _score_sync(model: IsolationForest, data: np.ndarray) -> np.ndarray:
+    n_jobs = IFOREST_JOBS if data.shape[0] >= PARALLEL_PREDICT_MIN_ROWS else 1
+    # sklearn's config is thread-local, so the finiteness checks are switched off here, in the
+    # worker thread that does the scoring, rather than once with set_config at import.
+    with joblib.parallel_backend("threading", n_jobs=n_jobs), config_context(assume_finite=True):
+        return _decision_function(model, data, n_jobs)
+
+async def _score_tracked(model: IsolationForest, data: np.ndarray) -> np.ndarray:
+    global _SCORES_IN_FLIGHT
+    _SCORES_IN_FLIGHT += 1
+    try:
+        return await asyncio.to_thread(_score_sync, model, data)
+    finally:
+        _SCORES_IN_FLIGHT -= 1
+
+async def _score(model: IsolationForest, data: np.ndarray) -> np.ndarray:
+    # A lone request has nothing to share a call with, so it never waits out the window.
+    if (_BATCH_QUEUE is None or data.shape[0] >= BATCH_MAX_ROWS
+            or (_SCORES_IN_FLIGHT == 0 and _BATCH_QUEUE.empty())):
+        return await _score_tracked(model, data)
+    future = asyncio.get_running_loop().create_future()
+    _BATCH_QUEUE.put_nowait((model, data, future))
+    return await future
+
+async def _flush_batch(batch: List[Tuple[IsolationForest, np.ndarray, asyncio.Future]]):
+    # Requests can only share a call when they hit the same model; feature counts were already
+    # checked against it by the endpoint.
+    groups: Dict[int, List[Tuple[IsolationForest, np.ndarray, asyncio.Future]]] = {}
+    for item in batch:
+        groups.setdefault(id(item[0]), []).append(item)
+    for items in groups.values():
+        futures = [future for _, _, future in items]
+        try:
+            scores = await _score_tracked(items[0][0], np.concatenate([data for _, data, _ in items]))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+        offsets = np.cumsum([data.shape[0] for _, data, _ in items[:-1]])
+        for future, request_scores in zip(futures, np.split(scores, offsets)):
+            if not future.done():
+                future.set_result(request_scores)
+
+async def _run_batcher(queue: "asyncio.Queue[Tuple[IsolationForest, np.ndarray, asyncio.Future]]"):
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await queue.get()]
+        n_rows = batch[0][1].shape[0]
+        deadline = loop.time() + BATCH_WINDOW_MS / 1000
+        while n_rows < BATCH_MAX_ROWS:
+            try:
+                item = await asyncio.wait_for(queue.get(), deadline - loop.time())
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            n_rows += item[1].shape[0]
+        # Scored in the background so the next batch can be collected, and scored, meanwhile.
+        flush = asyncio.create_task(_flush_batch(batch))
+        _BATCH_FLUSHES.add(flush)
+        flush.add_done_callback(_BATCH_FLUSHES.discard)
+
+def _load_model_sync(model_id: str) -> Tuple[IsolationForest, int]:
+    model_path = _get_model_path(model_id)
+    mtime = os.stat(model_path).st_mtime_ns
+    logger.info(f"Loading model '{model_id}' from disk.")
+    return _prepare_model(joblib.load(model_path)), mtime
+
+def _newest_models(limit: int) -> List[str]:
+    mtimes = {}
+    for model_id in _ON_DISK:
+        try:
+            mtimes[model_id] = os.stat(_get_model_path(model_id)).st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return sorted(mtimes, key=mtimes.get, reverse=True)[:limit]
+
+async def _warm_model_cache():
+    # Load what is already in MODEL_DIR before serving, so no request pays for a cold load. Only
+    # the newest models that fit in the cache are loaded, oldest first so the newest ends up as
+    # the most recently used.
+    for model_id in reversed(_newest_models(MODEL_CACHE_SIZE)):
+        try:
+            _cache_model(model_id, await asyncio.to_thread(_load_model_sync, model_id))
+        except Exception as e:
+            logger.warning(f"Could not preload model '{model_id}': {e}")
+    logger.info(f"Preloaded {_cached_model_count()} model(s) from '{MODEL_DIR}'.")
+
+async def get_or_train_model(model_id: str, data: np.ndarray, contamination: float) -> IsolationForest:
+    entry = _get_cached_entry(model_id)
+    if entry is not None:
+        return entry[0]
+    async with _MODEL_LOCKS.setdefault(model_id, asyncio.Lock()):
+        # Another request may have loaded or trained the model while we waited for the lock.
+        entry = _get_cached_entry(model_id)
+        if entry is not None:
+            return entry[0]
+        try:
+            entry = await asyncio.to_thread(_load_model_sync, model_id)
+        except FileNotFoundError:
+            model = await asyncio.to_thread(_train_model_sync, model_id, data, contamination)
+            entry = (_prepare_model(model), os.stat(_get_model_path(model_id)).st_mtime_ns)
+        _ON_DISK.add(model_id)
+        _cache_model(model_id, entry)
+        return entry[0]
+
+async def train_model(model_id: str, data: np.ndarray, contamination: float) -> bool:
+    # Unlike get_or_train_model this replaces an existing model, unless it was trained on the same
+    # data and settings. Returns whether a new model was trained.
+    digest = _training_digest(data, contamination)
+    async with _MODEL_LOCKS.setdefault(model_id, asyncio.Lock()):
+        # The cached digest is only trusted while the file is unchanged: another worker may have
+        # retrained the model before our watcher got round to evicting it.
+        entry = _get_cached_entry(model_id)
+        try:
+            mtime = os.stat(_get_model_path(model_id)).st_mtime_ns
+        except FileNotFoundError:
+            entry = None
+        else:
+            if entry is None or entry[1] != mtime:
+                try:
+                    entry = await asyncio.to_thread(_load_model_sync, model_id)
+                except FileNotFoundError:
+                    entry = None
+                else:
+                    _cache_model(model_id, entry)
+        if entry is not None and getattr(entry[0], "training_digest_", None) == digest:
+            return False
+        model = await asyncio.to_thread(_train_model_sync, model_id, data, contamination, digest)
+        _ON_DISK.add(model_id)
+        _cache_model(model_id, (_prepare_model(model), os.stat(_get_model_path(model_id)).st_mtime_ns))
+        return True
 
 @app.post("/train-model", response_model=TrainingResult, status_code=status.HTTP_201_CREATED)
 async def train_model_endpoint(training_data: TrainingData):
-    if not training_data.data:
+    if not training_data.data and training_data.raw_data is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Training data cannot be empty.")
-    data_np = np.array(training_data.data)
+    data_np = _payload_to_array(training_data)
     if data_np.ndim != 2:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Training data must be a list of lists (2D array).")
     try:
-        await get_or_train_model(training_data.model_id, data_np, training_data.contamination)
+        if not await train_model(training_data.model_id, data_np, training_data.contamination):
+            return TrainingResult(model_id=training_data.model_id, status="Success", message="Model already trained on identical data.")
         return TrainingResult(model_id=training_data.model_id, status="Success", message="Model trained and saved.")
     except Exception as e:
         logger.error(f"Error training model {training_data.model_id}: {e}")
@@ -88,45 +498,50 @@ async def train_model_endpoint(training_data: TrainingData):
 @app.post("/detect-anomalies", response_model=AnomalyDetectionOutput, summary="Detects anomalies in input data and provides Verifiability Score.")
 async def detect_anomalies_endpoint(input_data: DataInput):
     start_time = time.perf_counter()
-    if not input_data.data:
+    if not input_data.data and input_data.raw_data is None:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Input data cannot be empty.")
-    data_np = np.array(input_data.data)
+    data_np = _payload_to_array(input_data)
     if data_np.ndim != 2:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Input data must be a list of lists (2D array).")
     try:
         model = await get_or_train_model(input_data.model_id, data_np, input_data.contamination)
-        anomaly_predictions = model.predict(data_np).tolist()
-        anomaly_scores = model.decision_function(data_np)
-        min_score = anomaly_scores.min()
-        max_score = anomaly_scores.max()
+        if data_np.shape[1] != model.n_features_in_:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Input data has {data_np.shape[1]} features, but model '{input_data.model_id}' expects {model.n_features_in_}.")
+        anomaly_scores = await _score(model, data_np)
+        min_score, max_score, mean_score, labels = _summarize_scores(anomaly_scores)
         if max_score == min_score:
             empirical_verifiability_score = 1.0
         else:
-            normalized_scores = (anomaly_scores - min_score) / (max_score - min_score)
-            empirical_verifiability_score = float(np.mean(normalized_scores))
+            # mean((s - min) / (max - min)) == (mean(s) - min) / (max - min), without the temporary
+            # array; the clip only absorbs rounding in the mean.
+            empirical_verifiability_score = float(np.clip((mean_score - min_score) / (max_score - min_score), 0.0, 1.0))
         end_time = time.perf_counter()
         processing_time_ms = (end_time - start_time) * 1000
-        return AnomalyDetectionOutput(
-            model_id=input_data.model_id,
-            anomalies=anomaly_predictions,
-            empirical_verifiability_score=empirical_verifiability_score,
-            processing_time_ms=processing_time_ms
+        # Serialized by hand so the labels array goes straight to JSON instead of through a list of
+        # Python ints and pydantic; the body still matches AnomalyDetectionOutput.
+        return Response(
+            content=orjson.dumps({
+                "model_id": input_data.model_id,
+                "anomalies": labels,
+                "empirical_verifiability_score": empirical_verifiability_score,
+                "processing_time_ms": processing_time_ms
+            }, option=orjson.OPT_SERIALIZE_NUMPY),
+            media_type="application/json"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error during anomaly detection: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Anomaly detection failed: {e}")
 
 @app.get("/model-status/{model_id}", response_model=ModelStatus, summary="Get the status of a specific model.")
 async def get_model_status_endpoint(model_id: str):
-    model_path = _get_model_path(model_id)
-    if os.path.exists(model_path):
-        try:
-            model = joblib.load(model_path)
-            return ModelStatus(model_id=model_id, is_trained=True, data_shape=None)
-        except Exception as e:
-            logger.error(f"Error loading model '{model_id}': {e}")
-            return ModelStatus(model_id=model_id, is_trained=False, data_shape=None)
-    return ModelStatus(model_id=model_id, is_trained=False, data_shape=None)
+    is_trained = _is_cached(model_id) or model_id in _ON_DISK
+    if not is_trained and os.path.exists(_get_model_path(model_id)):
+        # Written by another worker and not yet reported by _watch_model_dir.
+        _ON_DISK.add(model_id)
+        is_trained = True
+    return ModelStatus(model_id=model_id, is_trained=is_trained, data_shape=None)
 
 @app.get("/health", status_code=status.HTTP_200_OK, summary="Health check endpoint.")
 async def health_check():
@@ -136,4 +551,10 @@ if __name__ == "__main__":
     if os.path.exists(MODEL_DIR):
         shutil.rmtree(MODEL_DIR)
         os.makedirs(MODEL_DIR, exist_ok=True)
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One process per core, each with its own model cache over the shared MODEL_DIR. Tree scoring
+    # threads are split between the workers unless IFOREST_JOBS is set explicitly. Workers import
+    # sklearn, load the JIT cache and preload models before answering the supervisor, so they get
+    # longer than uvicorn's default 5s health check.
+    workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+    os.environ.setdefault("IFOREST_JOBS", str(max(1, (os.cpu_count() or 1) // workers)))
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=workers, loop="uvloop", http="httptools", timeout_worker_healthcheck=60)
@@ -1,8 +1,11 @@
 import pytest
 import httpx
 import asyncio
+import base64
 import os
 import time
+import numpy as np
+from sklearn.ensemble import IsolationForest
 
 BASE_URL = "http://127.0.0.1:8000"
 
@@ -28,6 +31,19 @@ async def test_train_model_endpoint():
         assert response.json()["status"] == "Success"
         assert response.json()["model_id"] == model_id
 
+@pytest.mark.asyncio
+async def test_train_model_endpoint_skips_identical_retrain():
+    model_id = f"test_retrain_model_{int(time.time())}"
+    data = [[i * 1.0, i * 2.0] for i in range(100)]
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        response = await client.post("/train-model", json={"data": data, "model_id": model_id, "contamination": 0.01})
+        assert response.json()["message"] == "Model trained and saved."
+        response = await client.post("/train-model", json={"data": data, "model_id": model_id, "contamination": 0.01})
+        assert response.status_code == 201
+        assert response.json()["message"] == "Model already trained on identical data."
+        response = await client.post("/train-model", json={"data": data[:50], "model_id": model_id, "contamination": 0.01})
+        assert response.json()["message"] == "Model trained and saved."
+
 @pytest.mark.asyncio
 async def test_detect_anomalies_endpoint_with_new_model():
     model_id = f"test_detection_model_{int(time.time())}"
@@ -44,6 +60,69 @@ async def test_detect_anomalies_endpoint_with_new_model():
         assert 0.0 <= result["empirical_verifiability_score"] <= 1.0
         assert result["processing_time_ms"] > 0
 
+@pytest.mark.asyncio
+async def test_detect_anomalies_endpoint_concurrent_requests_match_sequential():
+    model_id = f"test_concurrent_detection_model_{int(time.time())}"
+    train_data = [[1.0, 1.0], [1.1, 1.1], [1.2, 1.2], [10.0, 10.0]]
+    rng = np.random.default_rng(0)
+    payloads = [{"data": rng.uniform(0, 12, size=(rng.integers(1, 6), 2)).tolist(), "model_id": model_id} for _ in range(40)]
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        train_response = await client.post("/train-model", json={"data": train_data, "model_id": model_id, "contamination": 0.25})
+        assert train_response.status_code == 201
+        sequential = [(await client.post("/detect-anomalies", json=payload)).json() for payload in payloads]
+        # Concurrent requests may be scored together when micro-batching is enabled on the server;
+        # each must still get exactly the result it gets on its own.
+        concurrent = [response.json() for response in await asyncio.gather(*[client.post("/detect-anomalies", json=payload) for payload in payloads])]
+    for alone, together in zip(sequential, concurrent):
+        assert together["anomalies"] == alone["anomalies"]
+        assert together["empirical_verifiability_score"] == alone["empirical_verifiability_score"]
+
+@pytest.mark.asyncio
+async def test_detect_anomalies_endpoint_with_raw_data():
+    model_id = f"test_raw_detection_model_{int(time.time())}"
+    train_data = [[1.0, 1.0], [1.1, 1.1], [1.2, 1.2], [10.0, 10.0]]
+    detect_data = [[1.15, 1.15], [10.5, 10.5], [1.0, 1.0]]
+    raw_data = base64.b64encode(np.asarray(detect_data, dtype="<f4").tobytes()).decode()
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        train_response = await client.post("/train-model", json={"data": train_data, "model_id": model_id, "contamination": 0.25})
+        assert train_response.status_code == 201
+        detect_response = await client.post("/detect-anomalies", json={"raw_data": raw_data, "n_rows": 3, "n_features": 2, "model_id": model_id})
+        assert detect_response.status_code == 200
+        assert detect_response.json()["anomalies"] == [1, -1, 1]
+        bad_response = await client.post("/detect-anomalies", json={"raw_data": raw_data, "n_rows": 2, "n_features": 2, "model_id": model_id})
+        assert bad_response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_detect_anomalies_endpoint_large_batch_matches_sklearn():
+    model_id = f"test_large_detection_model_{int(time.time())}"
+    rng = np.random.default_rng(7)
+    train_data = rng.normal(size=(2000, 3)).astype("<f4")
+    # Enough rows to reach the parallel scoring path, with missing values routed like sklearn does.
+    detect_data = rng.normal(scale=2.0, size=(1200, 3)).astype("<f4")
+    detect_data[::7, 1] = np.nan
+    detect_data[::11, 0] = np.nan
+    # Mirrors the server's default forest settings.
+    scores = IsolationForest(n_estimators=100, max_samples=256, contamination=0.05, random_state=42).fit(train_data).decision_function(detect_data)
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        train_response = await client.post("/train-model", json={"raw_data": base64.b64encode(train_data.tobytes()).decode(), "n_rows": 2000, "n_features": 3, "model_id": model_id, "contamination": 0.05})
+        assert train_response.status_code == 201
+        detect_response = await client.post("/detect-anomalies", json={"raw_data": base64.b64encode(detect_data.tobytes()).decode(), "n_rows": 1200, "n_features": 3, "model_id": model_id})
+        assert detect_response.status_code == 200
+        result = detect_response.json()
+    assert result["anomalies"] == np.where(scores < 0, -1, 1).tolist()
+    assert result["empirical_verifiability_score"] == pytest.approx((scores.mean() - scores.min()) / (scores.max() - scores.min()))
+
+@pytest.mark.asyncio
+async def test_detect_anomalies_endpoint_feature_count_mismatch():
+    model_id = f"test_mismatch_model_{int(time.time())}"
+    train_data = [[1.0, 1.0], [1.1, 1.1], [1.2, 1.2], [10.0, 10.0]]
+    async with httpx.AsyncClient(base_url=BASE_URL) as client:
+        train_response = await client.post("/train-model", json={"data": train_data, "model_id": model_id})
+        assert train_response.status_code == 201
+        response = await client.post("/detect-anomalies", json={"data": [[1.0, 1.0, 1.0]], "model_id": model_id})
+        assert response.status_code == 400
+        assert "features" in response.json()["detail"]
+
 @pytest.mark.asyncio
 async def test_detect_anomalies_endpoint_empty_data():
     async with httpx.AsyncClient(base_url=BASE_URL) as client: